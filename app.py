@@ -2,24 +2,37 @@
 FastAPI backend for Revenue Forecasting Dashboard.
 Serves historical data, forecast data, CAGR config, and triggers forecast runs.
 Includes data quality & management: upload, validation, audit logs, cleaning, scheduler.
+
+Deployment: run exactly one server process (`python app.py`, or `uvicorn app:app`
+without --workers). The audit id counter, data caches, scheduler and forecast lock
+live in the process; a second process on the same directory refuses to start.
 """
 
-import io
-import json
 import asyncio
 import hashlib
 import logging
+import os
+import threading
+import traceback
+from dataclasses import dataclass
 from datetime import datetime, timezone
 from pathlib import Path
 from typing import Optional
+from uuid import uuid4
 
 import numpy as np
+import orjson
 import pandas as pd
+import pyarrow as pa
 from apscheduler.schedulers.asyncio import AsyncIOScheduler
-from fastapi import FastAPI, File, HTTPException, Query, UploadFile
+from fastapi import BackgroundTasks, FastAPI, File, HTTPException, Query, UploadFile
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.middleware.gzip import GZipMiddleware
+from fastapi.responses import JSONResponse, Response, StreamingResponse
 from pydantic import BaseModel, Field
 
+from ra2 import run as run_ra2, write_atomic
+
 # ---------- Config ----------
 
 BASE_DIR = Path(__file__).resolve().parent
@@ -27,16 +40,22 @@ HISTORICAL_CSV = BASE_DIR / "Revenue_Sales_with_datetime 1.csv"
 CLIMATE_CSV = BASE_DIR / "kuppam_climate_approx 2.csv"
 FORECAST_CSV = BASE_DIR / "outputs" / "New_Load_Forecast.csv"
 CAGR_CONFIG = BASE_DIR / "outputs" / "cagr_config.json"
-AUDIT_LOG_FILE = BASE_DIR / "outputs" / "audit_log.json"
+AUDIT_LOG_FILE = BASE_DIR / "outputs" / "audit_log.jsonl"
+LEGACY_AUDIT_LOG_FILE = BASE_DIR / "outputs" / "audit_log.json"
 UPLOADS_DIR = BASE_DIR / "uploads"
-RA2_SCRIPT = BASE_DIR / "ra2.py"
+SERVER_LOCK_FILE = BASE_DIR / "outputs" / ".server.lock"
 
 DEFAULT_CAGR = 0.04
 DEFAULT_HORIZON = 60
 
 # Expected schema columns for the historical CSV (required subset)
 REQUIRED_COLUMNS = {"FY", "Month", "Month_num", "Total"}
-NUMERIC_COLUMNS = ["Total", "kWh"] + [f"L{i}" for i in range(1, 12)]
+L_COLS = tuple(f"L{i}" for i in range(1, 12))
+NUMERIC_COLUMNS = ["Total", "kWh", *L_COLS]
+
+# Compact dtypes for the cached historical frame. Numeric columns stay float64/int64:
+# kWh and rupee totals exceed float32's exact-integer range.
+HISTORICAL_DTYPES = {"FY": "category", "Month": "category"}
 
 # Outlier detection: values beyond IQR_FACTOR * IQR are flagged
 IQR_FACTOR = 3.0
@@ -55,60 +74,139 @@ CATEGORY_MAP = {
 }
 
 
-def apply_category_mapping(row: dict, available_cols: list[str]) -> dict:
-    """Sum source columns into category groups."""
-    result = {}
-    for category, source_cols in CATEGORY_MAP.items():
-        vals = [row.get(c, 0) or 0 for c in source_cols if c in available_cols]
-        result[category] = sum(vals)
-    return result
+# CATEGORY_MAP source columns laid out contiguously, plus each category's start offset
+_GROUPED_COLS = [c for source_cols in CATEGORY_MAP.values() for c in source_cols]
+_GROUP_OFFSETS = np.cumsum([0] + [len(source_cols) for source_cols in CATEGORY_MAP.values()])[:-1]
+
+
+def _category_sums(df: pd.DataFrame) -> np.ndarray:
+    """Sum source columns into category groups in a single reduceat pass.
+
+    Returns an (n_rows, n_categories) array in CATEGORY_MAP order.
+    """
+    block = df.reindex(columns=_GROUPED_COLS, fill_value=0).to_numpy(dtype=np.float64)
+    return np.add.reduceat(block, _GROUP_OFFSETS, axis=1)
 
 
 # ---------- CAGR persistence ----------
 
+# (file mtime, parsed config) of the last read
+_cagr_cache: Optional[tuple[int, dict]] = None
+
+
 def read_cagr_config() -> dict:
     """Read CAGR config from JSON file, or return defaults."""
+    global _cagr_cache
     if CAGR_CONFIG.exists():
-        with open(CAGR_CONFIG, "r") as f:
-            return json.load(f)
+        mtime = CAGR_CONFIG.stat().st_mtime_ns
+        if _cagr_cache is None or _cagr_cache[0] != mtime:
+            with open(CAGR_CONFIG, "rb") as f:
+                _cagr_cache = (mtime, orjson.loads(f.read()))
+        return dict(_cagr_cache[1])
     return {"cagr": DEFAULT_CAGR, "horizon": DEFAULT_HORIZON}
 
 
 def write_cagr_config(cagr: float, horizon: int):
     """Write CAGR config to JSON file."""
+    global _cagr_cache
+    _cagr_cache = None
+    config = {"cagr": cagr, "horizon": horizon}
     CAGR_CONFIG.parent.mkdir(parents=True, exist_ok=True)
-    with open(CAGR_CONFIG, "w") as f:
-        json.dump({"cagr": cagr, "horizon": horizon}, f, indent=2)
+    data = orjson.dumps(config, option=orjson.OPT_INDENT_2)
+    write_atomic(CAGR_CONFIG, lambda tmp: Path(tmp).write_bytes(data))
+    # Prime the cache with what was just written so the next read skips the parse
+    _cagr_cache = (CAGR_CONFIG.stat().st_mtime_ns, config)
 
 
 # ---------- Audit log ----------
 
-def _load_audit_log() -> list:
+# The log is JSONL: one entry per line, appended in id order.
+
+def _migrate_legacy_audit_log():
+    """Convert the old JSON-array audit log to JSONL once, if present. Call under _audit_lock."""
+    if LEGACY_AUDIT_LOG_FILE.exists() and not AUDIT_LOG_FILE.exists():
+        entries = orjson.loads(LEGACY_AUDIT_LOG_FILE.read_bytes())
+        data = b"".join(orjson.dumps(entry) + b"\n" for entry in entries)
+        write_atomic(AUDIT_LOG_FILE, lambda tmp: Path(tmp).write_bytes(data))
+        LEGACY_AUDIT_LOG_FILE.unlink()
+
+
+def _load_audit_log(action: str, size: int) -> list:
+    """Parse the entries of one action type in the first `size` bytes of the log, in id order."""
+    entries = []
+    if not size:
+        return entries
+    # Lines are compact orjson, so a byte search skips parsing most non-matching entries
+    needle = b'"action":' + orjson.dumps(action)
+    with open(AUDIT_LOG_FILE, "rb") as f:
+        for line in f:
+            # Stop at `size`, so a line still being appended is never parsed
+            if size <= 0:
+                break
+            size -= len(line)
+            if needle in line:
+                entry = orjson.loads(line)
+                if entry.get("action") == action:
+                    entries.append(entry)
+    return entries
+
+
+def _read_audit_tail(size: int, n: int, block_size: int = 1 << 16) -> list[bytes]:
+    """Return up to n of the newest lines in the first `size` bytes of the log, newest first."""
+    lines: list[bytes] = []
+    with open(AUDIT_LOG_FILE, "rb") as f:
+        pos, rest = size, b""
+        while pos > 0 and len(lines) < n:
+            step = min(block_size, pos)
+            pos -= step
+            f.seek(pos)
+            parts = (f.read(step) + rest).split(b"\n")
+            rest = parts.pop(0)  # may be the end of a line that starts in an earlier block
+            lines.extend(line for line in reversed(parts) if line.strip())
+        if pos == 0 and rest.strip():
+            lines.append(rest)
+    return lines[:n]
+
+
+def _count_audit_entries() -> int:
     AUDIT_LOG_FILE.parent.mkdir(parents=True, exist_ok=True)
+    _migrate_legacy_audit_log()
     if AUDIT_LOG_FILE.exists():
-        with open(AUDIT_LOG_FILE, "r") as f:
-            return json.load(f)
-    return []
+        with open(AUDIT_LOG_FILE, "rb") as f:
+            return sum(1 for line in f if line.strip())
+    return 0
 
 
-def _save_audit_log(entries: list):
-    AUDIT_LOG_FILE.parent.mkdir(parents=True, exist_ok=True)
-    with open(AUDIT_LOG_FILE, "w") as f:
-        json.dump(entries, f, indent=2, default=str)
+# Serializes appends and the id counter across worker threads. The counter is per
+# process, which is why the server runs a single worker (see _acquire_server_lock).
+_audit_lock = threading.Lock()
+_audit_seq: Optional[int] = None  # id of the last entry, counted from the file on first use
+
+
+def _ensure_audit_seq() -> int:
+    """Return the id of the last entry, counting the file on first use. Call under _audit_lock."""
+    global _audit_seq
+    if _audit_seq is None:
+        _audit_seq = _count_audit_entries()
+    return _audit_seq
 
 
 def add_audit_entry(action: str, details: str, user: str = "system", status: str = "success"):
     """Append a timestamped entry to the audit log."""
-    entries = _load_audit_log()
-    entries.append({
-        "id": len(entries) + 1,
-        "timestamp": datetime.now(timezone.utc).isoformat(),
-        "action": action,
-        "details": details,
-        "user": user,
-        "status": status,
-    })
-    _save_audit_log(entries)
+    global _audit_seq
+    with _audit_lock:
+        _ensure_audit_seq()
+        entry = {
+            "id": _audit_seq + 1,
+            "timestamp": datetime.now(timezone.utc).isoformat(),
+            "action": action,
+            "details": details,
+            "user": user,
+            "status": status,
+        }
+        with open(AUDIT_LOG_FILE, "ab") as f:
+            f.write(orjson.dumps(entry) + b"\n")
+        _audit_seq += 1
 
 
 # ---------- Data validation ----------
@@ -133,49 +231,50 @@ def validate_dataframe(df: pd.DataFrame) -> dict:
 
     # Missing value check
     missing_counts = {}
-    for col in df.columns:
-        n_missing = int(df[col].isna().sum())
-        if n_missing > 0:
-            missing_counts[col] = n_missing
-            pct = n_missing / len(df) * 100
-            if pct > 20:
-                warnings.append(f"Column '{col}' has {n_missing} missing values ({pct:.1f}%)")
-            else:
-                info.append(f"Column '{col}' has {n_missing} missing values ({pct:.1f}%)")
-
-    # Numeric range / outlier check using IQR
+    n_missing_by_col = df.isna().sum()
+    for col, n_missing in n_missing_by_col[n_missing_by_col > 0].items():
+        n_missing = int(n_missing)
+        missing_counts[col] = n_missing
+        pct = n_missing / len(df) * 100
+        if pct > 20:
+            warnings.append(f"Column '{col}' has {n_missing} missing values ({pct:.1f}%)")
+        else:
+            info.append(f"Column '{col}' has {n_missing} missing values ({pct:.1f}%)")
+
+    # Numeric range / outlier check using IQR (all columns at once)
     outliers = []
     numeric_cols_present = [c for c in NUMERIC_COLUMNS if c in df.columns]
-    for col in numeric_cols_present:
-        series = pd.to_numeric(df[col], errors="coerce").dropna()
-        if len(series) < 4:
-            continue
-        q1, q3 = series.quantile(0.25), series.quantile(0.75)
-        iqr = q3 - q1
-        if iqr == 0:
-            continue
-        lower = q1 - IQR_FACTOR * iqr
-        upper = q3 + IQR_FACTOR * iqr
-        flagged = df[(pd.to_numeric(df[col], errors="coerce") < lower) |
-                     (pd.to_numeric(df[col], errors="coerce") > upper)]
-        if not flagged.empty:
-            outliers.append({
-                "column": col,
-                "count": int(len(flagged)),
-                "lower_bound": float(lower),
-                "upper_bound": float(upper),
-            })
-            warnings.append(
-                f"Column '{col}' has {len(flagged)} potential outlier(s) "
-                f"(outside [{lower:.2f}, {upper:.2f}])"
-            )
+    # One float64 matrix (rows x numeric columns); each check below is a column-wise array op
+    mat = (
+        df[numeric_cols_present].apply(pd.to_numeric, errors="coerce")
+        .to_numpy(dtype=np.float64, na_value=np.nan)
+    )
+    # Columns with fewer than 4 values are not checked
+    checked = np.flatnonzero(np.count_nonzero(~np.isnan(mat), axis=0) >= 4)
+    # reshape keeps the (2, n_checked) shape when no column qualifies (nanquantile returns (0,) then)
+    q1, q3 = np.nanquantile(mat[:, checked], [0.25, 0.75], axis=0).reshape(2, -1)
+    iqr = q3 - q1
+    lower = q1 - IQR_FACTOR * iqr
+    upper = q3 + IQR_FACTOR * iqr
+    outlier_counts = np.count_nonzero((mat[:, checked] < lower) | (mat[:, checked] > upper), axis=0)
+    for j in np.flatnonzero((iqr != 0) & (outlier_counts > 0)):
+        col = numeric_cols_present[checked[j]]
+        n_flagged = int(outlier_counts[j])
+        outliers.append({
+            "column": col,
+            "count": n_flagged,
+            "lower_bound": float(lower[j]),
+            "upper_bound": float(upper[j]),
+        })
+        warnings.append(
+            f"Column '{col}' has {n_flagged} potential outlier(s) "
+            f"(outside [{lower[j]:.2f}, {upper[j]:.2f}])"
+        )
 
     # Negative value check for numeric columns
-    for col in numeric_cols_present:
-        series = pd.to_numeric(df[col], errors="coerce")
-        n_neg = int((series < 0).sum())
-        if n_neg > 0:
-            warnings.append(f"Column '{col}' has {n_neg} negative value(s)")
+    neg_counts = np.count_nonzero(mat < 0, axis=0)
+    for j in np.flatnonzero(neg_counts):
+        warnings.append(f"Column '{numeric_cols_present[j]}' has {int(neg_counts[j])} negative value(s)")
 
     info.append(f"Dataset has {len(df)} rows and {len(df.columns)} columns")
 
@@ -197,11 +296,14 @@ def clean_dataframe(df: pd.DataFrame, strategy: str = "median") -> tuple[pd.Data
     strategy: 'median' | 'mean' | 'zero' | 'drop'
     Returns (cleaned_df, list_of_actions).
     """
+    numeric_cols = [c for c in NUMERIC_COLUMNS if c in df.columns]
+    missing = df[numeric_cols].isna().sum()
+    if not missing.any():
+        return df, []
+
     actions = []
     df = df.copy()
 
-    numeric_cols = [c for c in NUMERIC_COLUMNS if c in df.columns]
-
     if strategy == "drop":
         before = len(df)
         df = df.dropna(subset=numeric_cols)
@@ -209,19 +311,18 @@ def clean_dataframe(df: pd.DataFrame, strategy: str = "median") -> tuple[pd.Data
         if dropped:
             actions.append(f"Dropped {dropped} rows with missing numeric values")
     else:
-        for col in numeric_cols:
-            n_missing = int(df[col].isna().sum())
-            if n_missing == 0:
-                continue
-            if strategy == "mean":
-                fill_val = df[col].mean()
-            elif strategy == "zero":
-                fill_val = 0
-            else:  # median (default)
-                fill_val = df[col].median()
-            df[col] = df[col].fillna(fill_val)
+        missing = missing[missing > 0]
+        cols = list(missing.index)
+        if strategy == "mean":
+            fill_vals = df[cols].mean()
+        elif strategy == "zero":
+            fill_vals = pd.Series(0, index=cols)
+        else:  # median (default)
+            fill_vals = df[cols].median()
+        df[cols] = df[cols].fillna(fill_vals)
+        for col, n_missing in missing.items():
             actions.append(
-                f"Filled {n_missing} missing values in '{col}' with {strategy} ({fill_val:.4f})"
+                f"Filled {int(n_missing)} missing values in '{col}' with {strategy} ({fill_vals[col]:.4f})"
             )
 
     return df, actions
@@ -229,24 +330,105 @@ def clean_dataframe(df: pd.DataFrame, strategy: str = "median") -> tuple[pd.Data
 
 # ---------- In-memory cache of historical data ----------
 
-_historical_cache: Optional[pd.DataFrame] = None
+def _read_csv(path: Path) -> pd.DataFrame:
+    """Parse a data CSV with the multithreaded Arrow reader."""
+    with open(path, "rb") as f:
+        # The file is read once front to back; let the kernel read ahead aggressively
+        if hasattr(os, "posix_fadvise"):
+            os.posix_fadvise(f.fileno(), 0, 0, os.POSIX_FADV_SEQUENTIAL)
+        return pd.read_csv(f, engine="pyarrow")
+
+
+def _with_historical_dtypes(df: pd.DataFrame) -> pd.DataFrame:
+    """Store the repeated labels of a historical-format frame as categoricals."""
+    return df.astype({col: dtype for col, dtype in HISTORICAL_DTYPES.items() if col in df.columns})
+
+
+def _read_historical_csv(path: Path = HISTORICAL_CSV) -> pd.DataFrame:
+    """Parse the app's own historical CSV with the Arrow reader."""
+    return _with_historical_dtypes(_read_csv(path))
+
+
+@dataclass
+class HistoricalCache:
+    """
+    The loaded historical DataFrame, the arrays every consumer needs (derived
+    once at load), and the API payloads, built on first use.
+    """
+    df: pd.DataFrame
+    category_sums: np.ndarray  # (n_rows, n_categories) in CATEGORY_MAP order
+    ef: np.ndarray  # EF as float64, NaN where missing or non-numeric
+    last_ef: float  # last valid EF, 0.0 if there is none
+    frame: Optional[pd.DataFrame] = None  # category sums / tCO2 columns
+    records: Optional[list[dict]] = None
+    body: Optional[bytes] = None  # /api/historical JSON
+    arrow: Optional[bytes] = None  # /api/historical?format=arrow IPC stream
+
+    def get_frame(self) -> pd.DataFrame:
+        if self.frame is None:
+            self.frame = _historical_frame(self)
+        return self.frame
+
+    def get_records(self) -> list[dict]:
+        if self.records is None:
+            self.records = self.get_frame().to_dict(orient="records")
+        return self.records
+
+    def get_body(self) -> bytes:
+        if self.body is None:
+            self.body = orjson.dumps({"data": self.get_records()}, option=ORJSON_OPTIONS)
+        return self.body
+
+    def get_arrow(self) -> bytes:
+        if self.arrow is None:
+            self.arrow = _arrow_ipc(self.get_frame())
+        return self.arrow
+
+
+# Replaced wholesale on reload, so a payload built from old data never lands in the new cache
+_historical: Optional[HistoricalCache] = None
+# (forecast CSV mtime, historical cache its EF came from, payload)
+_forecast_cache: Optional[tuple[int, Optional[HistoricalCache], dict]] = None
+
+
+def set_historical(df: pd.DataFrame) -> pd.DataFrame:
+    """Install an already parsed historical DataFrame as the cache, dropping derived payloads."""
+    global _historical, _forecast_cache
+    # Match what re-reading the CSV would give: a fresh RangeIndex and categorical labels
+    df = df.reset_index(drop=True)
+    df = _with_historical_dtypes(df)
+    ef = _coerce_ef(df).to_numpy(dtype=np.float64)
+    valid_efs = ef[~np.isnan(ef)]
+    _historical = HistoricalCache(
+        df=df,
+        category_sums=_category_sums(df),
+        ef=ef,
+        last_ef=float(valid_efs[-1]) if len(valid_efs) else 0.0,
+    )
+    # Forecast payload carries the last historical EF, so drop it too. A build that
+    # was already running still stores its payload, but keyed on the old cache.
+    _forecast_cache = None
+    return df
 
 
 def load_historical() -> pd.DataFrame:
     """Load historical CSV, refreshing the in-memory cache."""
-    global _historical_cache
     if not HISTORICAL_CSV.exists():
         raise FileNotFoundError("Historical CSV not found")
-    _historical_cache = pd.read_csv(HISTORICAL_CSV)
-    return _historical_cache
+    return set_historical(_read_historical_csv())
+
+
+def get_historical_cache() -> Optional[HistoricalCache]:
+    """Return the historical cache, loading it if necessary."""
+    if _historical is None and HISTORICAL_CSV.exists():
+        set_historical(_read_historical_csv())
+    return _historical
 
 
 def get_cached_historical() -> Optional[pd.DataFrame]:
     """Return cached DataFrame, loading it if necessary."""
-    global _historical_cache
-    if _historical_cache is None and HISTORICAL_CSV.exists():
-        _historical_cache = pd.read_csv(HISTORICAL_CSV)
-    return _historical_cache
+    cache = get_historical_cache()
+    return cache.df if cache is not None else None
 
 
 # ---------- Scheduler ----------
@@ -254,20 +436,61 @@ def get_cached_historical() -> Optional[pd.DataFrame]:
 async def scheduled_refresh():
     """Reload historical data from disk on a schedule."""
     try:
-        load_historical()
-        add_audit_entry("scheduled_refresh", "Periodic data refresh completed", user="scheduler")
+        await asyncio.to_thread(load_historical)
+        await asyncio.to_thread(warm_payloads)
+        await asyncio.to_thread(
+            add_audit_entry, "scheduled_refresh", "Periodic data refresh completed", user="scheduler"
+        )
         logger.info("Scheduled data refresh completed")
     except Exception as exc:
-        add_audit_entry("scheduled_refresh", f"Refresh failed: {exc}", user="scheduler", status="error")
+        await asyncio.to_thread(
+            add_audit_entry, "scheduled_refresh", f"Refresh failed: {exc}", user="scheduler", status="error"
+        )
         logger.error("Scheduled refresh failed: %s", exc)
 
 
 scheduler = AsyncIOScheduler()
 
 
+# ---------- Single-process guard ----------
+
+_server_lock = None  # SERVER_LOCK_FILE, held open (and locked) for the life of the process
+
+
+def _acquire_server_lock():
+    """Claim the data directory for this process, failing if another server holds it."""
+    global _server_lock
+    if _server_lock is not None:
+        return
+    try:
+        import fcntl
+    except ImportError:  # Windows has no flock; rely on the documented single-worker setup
+        return
+    f = open(SERVER_LOCK_FILE, "a")
+    try:
+        fcntl.flock(f, fcntl.LOCK_EX | fcntl.LOCK_NB)
+    except BlockingIOError:
+        f.close()
+        raise RuntimeError(
+            "Another server process is already running from this directory; "
+            "run a single worker (no uvicorn --workers / WEB_CONCURRENCY)"
+        )
+    _server_lock = f
+
+
 # ---------- FastAPI app ----------
 
-app = FastAPI(title="Revenue Forecasting API", version="2.0.0")
+ORJSON_OPTIONS = orjson.OPT_SERIALIZE_NUMPY
+
+
+class ORJSONResponse(JSONResponse):
+    """JSON response rendered by orjson; NaN/inf become null and NumPy scalars are accepted."""
+
+    def render(self, content) -> bytes:
+        return orjson.dumps(content, option=ORJSON_OPTIONS)
+
+
+app = FastAPI(title="Revenue Forecasting API", version="2.0.0", default_response_class=ORJSONResponse)
 
 app.add_middleware(
     CORSMiddleware,
@@ -276,13 +499,20 @@ app.add_middleware(
     allow_methods=["*"],
     allow_headers=["*"],
 )
+# Historical/forecast payloads repeat the same keys on every row and compress well
+app.add_middleware(GZipMiddleware, minimum_size=1024)
 
 
 @app.on_event("startup")
 async def startup_event():
     UPLOADS_DIR.mkdir(parents=True, exist_ok=True)
     CAGR_CONFIG.parent.mkdir(parents=True, exist_ok=True)
+    _acquire_server_lock()
+    with _audit_lock:
+        _migrate_legacy_audit_log()
     load_historical()
+    # Parse both datasets once up front so no request pays for CSV parsing
+    warm_payloads()
     # Schedule a refresh every 6 hours
     scheduler.add_job(scheduled_refresh, "interval", hours=6, id="data_refresh")
     scheduler.start()
@@ -311,55 +541,245 @@ class CleanRequest(BaseModel):
     apply: bool = Field(default=False, description="If true, apply cleaning and overwrite historical CSV")
 
 
+# Response schemas. Used for OpenAPI docs only: the data endpoints return
+# prebuilt ORJSONResponse objects, so rows are never validated per request.
+
+class EmissionRecord(BaseModel):
+    date: str | None = None
+    residential: float
+    commercial: float
+    industrial: float
+    agriculture: float
+    others: float
+    total: float | None = None
+    kwh: float | None = None
+    ef: float = Field(..., description="Emission factor (tCO2 per unit)")
+    residential_tco2: float
+    commercial_tco2: float
+    industrial_tco2: float
+    agriculture_tco2: float
+    others_tco2: float
+    total_tco2: float
+
+
+class HistoricalRecord(EmissionRecord):
+    fy: str
+    month: str
+    month_num: int
+    kvah: float | None = None
+    loss: float | None = None
+    loss_pct: float | None = None
+
+
+class HistoricalResponse(BaseModel):
+    data: list[HistoricalRecord]
+
+
+class ForecastResponse(BaseModel):
+    data: list[EmissionRecord]
+    cagr: float
+    horizon_months: int
+    ef_used: float
+
+
 # ---------- Helpers ----------
 
-def _df_to_records(df: pd.DataFrame) -> list[dict]:
-    """Convert historical DataFrame to API records."""
-    L_COLS = [f"L{i}" for i in range(1, 12)]
-    available_l_cols = [c for c in L_COLS if c in df.columns]
-    records = []
-    for _, row in df.iterrows():
-        row_dict = row.to_dict()
-        mapped = apply_category_mapping(row_dict, available_l_cols)
-        ef = float(row_dict.get("EF", 0)) if pd.notna(row_dict.get("EF")) else 0
-        record = {
-            "fy": row_dict.get("FY"),
-            "month": row_dict.get("Month"),
-            "month_num": int(row_dict.get("Month_num", 0)),
-            "date": row_dict.get("Date"),
-            **mapped,
-            "total": row_dict.get("Total"),
-            "kwh": row_dict.get("kWh"),
-            "kvah": row_dict.get("kVAh") if pd.notna(row_dict.get("kVAh")) else None,
-            "loss": row_dict.get("Loss") if pd.notna(row_dict.get("Loss")) else None,
-            "loss_pct": row_dict.get("Loss %") if pd.notna(row_dict.get("Loss %")) else None,
-            "ef": ef,
-            "residential_tco2": mapped.get("residential", 0) * ef,
-            "commercial_tco2": mapped.get("commercial", 0) * ef,
-            "industrial_tco2": mapped.get("industrial", 0) * ef,
-            "agriculture_tco2": mapped.get("agriculture", 0) * ef,
-            "others_tco2": mapped.get("others", 0) * ef,
-            "total_tco2": row_dict.get("Total", 0) * ef,
-        }
-        records.append(record)
-    return records
+# Source columns read into the API records (absent ones are reported as null)
+HISTORICAL_SOURCE_COLUMNS = ["FY", "Month", "Month_num", "Date", "Total", "kWh", "kVAh", "Loss", "Loss %"]
+FORECAST_SOURCE_COLUMNS = ["TestDates", "Total", "kWh"]
+# Historical fields that are reported as null when the source cell is empty
+OPTIONAL_SOURCE_COLUMNS = ["Date", "kVAh", "Loss", "Loss %"]
+CATEGORIES = list(CATEGORY_MAP)
+TCO2_COLUMNS = [f"{category}_tco2" for category in CATEGORY_MAP] + ["total_tco2"]
+
+
+def _tco2_block(cats: np.ndarray, total: pd.Series, ef) -> np.ndarray:
+    """Convert category sums and totals to tCO2 with a single in-place broadcast multiply.
+
+    Returns an array with one column per TCO2_COLUMNS entry. A missing Total
+    counts as 0, so total_tco2 is always a number.
+    """
+    block = np.column_stack([cats, total.fillna(0).to_numpy(dtype=np.float64)])
+    np.multiply(block, np.asarray(ef, dtype=np.float64).reshape(-1, 1), out=block)
+    return block
+
+
+def _columns(names: list[str], block: np.ndarray) -> dict:
+    """Map column names onto the columns of a 2-D array."""
+    return {name: block[:, i] for i, name in enumerate(names)}
+
+
+def _coerce_ef(df: pd.DataFrame) -> pd.Series:
+    """Return the EF column as floats; absent or non-numeric cells become NaN."""
+    return pd.to_numeric(df.get("EF", pd.Series(np.nan, index=df.index)), errors="coerce")
+
+
+def _historical_frame(cache: HistoricalCache) -> pd.DataFrame:
+    """Build the historical API columns (one row per record) from the cached source data."""
+    src = cache.df.reindex(columns=HISTORICAL_SOURCE_COLUMNS)
+    cats = cache.category_sums
+    ef = np.nan_to_num(cache.ef, nan=0.0)
+    optional = src[OPTIONAL_SOURCE_COLUMNS]
+    optional = optional.astype(object).where(optional.notna().to_numpy(), None)
+
+    # Build the output frame column-wise in one shot, then convert once
+    return pd.DataFrame({
+        "fy": src["FY"],
+        "month": src["Month"],
+        "month_num": src["Month_num"].fillna(0).astype(int),
+        "date": optional["Date"],
+        **_columns(CATEGORIES, cats),
+        "total": src["Total"],
+        "kwh": src["kWh"],
+        "kvah": optional["kVAh"],
+        "loss": optional["Loss"],
+        "loss_pct": optional["Loss %"],
+        "ef": ef,
+        **_columns(TCO2_COLUMNS, _tco2_block(cats, src["Total"], ef)),
+    })
+
+
+def _arrow_ipc(frame: pd.DataFrame) -> bytes:
+    """Encode an API frame as an Arrow IPC stream."""
+    table = pa.Table.from_pandas(frame, preserve_index=False)
+    sink = pa.BufferOutputStream()
+    with pa.ipc.new_stream(sink, table.schema) as writer:
+        writer.write_table(table)
+    return sink.getvalue().to_pybytes()
+
+
+def _build_forecast_payload(historical: Optional[HistoricalCache]) -> dict:
+    """Convert the forecast CSV to API records, priced at the last EF of `historical`."""
+    df = _read_csv(FORECAST_CSV)
+
+    last_ef = historical.last_ef if historical is not None else 0.0
+
+    src = df.reindex(columns=FORECAST_SOURCE_COLUMNS)
+    cats = _category_sums(df)
+    out = pd.DataFrame({
+        "date": src["TestDates"],
+        **_columns(CATEGORIES, cats),
+        "total": src["Total"],
+        "kwh": src["kWh"],
+        "ef": last_ef,
+        **_columns(TCO2_COLUMNS, _tco2_block(cats, src["Total"], last_ef)),
+    })
+
+    records = out.to_dict(orient="records")
+    # Encode the records once; responses embed the bytes as an orjson Fragment
+    return {
+        "data": records,
+        "data_json": orjson.dumps(records, option=ORJSON_OPTIONS),
+        "data_arrow": _arrow_ipc(out),
+        "ef_used": last_ef,
+    }
+
+
+def get_historical_records() -> Optional[list[dict]]:
+    """Return cached historical API records, building them if necessary."""
+    cache = get_historical_cache()
+    return cache.get_records() if cache is not None else None
+
+
+def get_historical_body() -> Optional[bytes]:
+    """Return the encoded /api/historical JSON body, serializing it once per reload."""
+    cache = get_historical_cache()
+    return cache.get_body() if cache is not None else None
+
+
+def get_historical_arrow() -> Optional[bytes]:
+    """Return the historical records as an Arrow IPC stream, encoded once per reload."""
+    cache = get_historical_cache()
+    return cache.get_arrow() if cache is not None else None
+
+
+def _warm_forecast() -> Optional[dict]:
+    """Return the cached forecast payload if it is current for both the CSV and the historical data."""
+    cached = _forecast_cache
+    if cached is not None and cached[1] is _historical and cached[0] == FORECAST_CSV.stat().st_mtime_ns:
+        return cached[2]
+    return None
+
+
+def get_cached_forecast() -> dict:
+    """Return the cached forecast payload, rebuilding it when the CSV or historical data changes."""
+    global _forecast_cache
+    mtime = FORECAST_CSV.stat().st_mtime_ns
+    historical = get_historical_cache()
+    cached = _forecast_cache
+    if cached is None or cached[0] != mtime or cached[1] is not historical:
+        cached = (mtime, historical, _build_forecast_payload(historical))
+        _forecast_cache = cached
+    return cached[2]
+
+
+def warm_payloads():
+    """Encode the /api/historical and /api/forecast bodies ahead of the next request."""
+    get_historical_body()
+    if FORECAST_CSV.exists():
+        # An unreadable forecast CSV only breaks /api/forecast; it must not stop
+        # startup or fail a refresh whose historical reload succeeded
+        try:
+            get_cached_forecast()
+        except Exception:
+            logger.exception("Could not build the forecast payload from %s", FORECAST_CSV.name)
+
+
+def _ndjson_stream(records: list[dict], chunk_size: int = 500):
+    """Yield records as newline-delimited JSON, one chunk of rows per write."""
+    for start in range(0, len(records), chunk_size):
+        yield b"".join(
+            orjson.dumps(record, option=ORJSON_OPTIONS | orjson.OPT_APPEND_NEWLINE)
+            for record in records[start:start + chunk_size]
+        )
 
 
 # ---------- Endpoints ----------
 
-@app.get("/api/historical")
-def get_historical_data():
+FORMAT_QUERY = Query(
+    default="json",
+    alias="format",
+    pattern="^(json|ndjson|arrow)$",
+    description="'json' (default), 'ndjson' to stream one record per line, or 'arrow' for an Arrow IPC stream",
+)
+ARROW_MEDIA_TYPE = "application/vnd.apache.arrow.stream"
+
+
+async def _cached_or_build(cached, build):
+    """Return a warm cached value directly, or build it in a worker thread on a miss."""
+    if cached is not None:
+        return cached
+    return await asyncio.to_thread(build)
+
+
+def _warm_historical(field: str):
+    """Return an already built historical payload field, or None."""
+    return getattr(_historical, field) if _historical is not None else None
+
+
+@app.get("/api/historical", responses={200: {"model": HistoricalResponse}})
+async def get_historical_data(fmt: str = FORMAT_QUERY):
     """Return historical revenue data with category mapping, grouped by FY/month."""
     if not HISTORICAL_CSV.exists():
         raise HTTPException(status_code=404, detail="Historical CSV not found")
-    df = get_cached_historical()
-    if df is None:
+    if fmt == "ndjson":
+        records = await _cached_or_build(_warm_historical("records"), get_historical_records)
+        if records is None:
+            raise HTTPException(status_code=404, detail="Historical data not loaded")
+        return StreamingResponse(_ndjson_stream(records), media_type="application/x-ndjson")
+    if fmt == "arrow":
+        body = await _cached_or_build(_warm_historical("arrow"), get_historical_arrow)
+        if body is None:
+            raise HTTPException(status_code=404, detail="Historical data not loaded")
+        return Response(content=body, media_type=ARROW_MEDIA_TYPE)
+    body = await _cached_or_build(_warm_historical("body"), get_historical_body)
+    if body is None:
         raise HTTPException(status_code=404, detail="Historical data not loaded")
-    return {"data": _df_to_records(df)}
+    return Response(content=body, media_type="application/json")
 
 
-@app.get("/api/forecast")
-def get_forecast_data():
+@app.get("/api/forecast", responses={200: {"model": ForecastResponse}})
+async def get_forecast_data(fmt: str = FORMAT_QUERY):
     """Return forecast data with category mapping."""
     if not FORECAST_CSV.exists():
         raise HTTPException(
@@ -367,45 +787,20 @@ def get_forecast_data():
             detail="Forecast CSV not found. Run the forecast first via /api/run-forecast",
         )
 
-    df = pd.read_csv(FORECAST_CSV)
+    payload = await _cached_or_build(_warm_forecast(), get_cached_forecast)
+    if fmt == "ndjson":
+        # Records only; CAGR settings are available from /api/cagr
+        return StreamingResponse(_ndjson_stream(payload["data"]), media_type="application/x-ndjson")
+    if fmt == "arrow":
+        return Response(content=payload["data_arrow"], media_type=ARROW_MEDIA_TYPE)
     config = read_cagr_config()
 
-    # Get last known EF from historical data
-    last_ef = 0.0
-    hist_df = get_cached_historical()
-    if hist_df is not None and "EF" in hist_df.columns:
-        valid_efs = hist_df["EF"].dropna()
-        if len(valid_efs) > 0:
-            last_ef = float(valid_efs.iloc[-1])
-
-    L_COLS = [f"L{i}" for i in range(1, 12)]
-    available_l_cols = [c for c in L_COLS if c in df.columns]
-
-    records = []
-    for _, row in df.iterrows():
-        row_dict = row.to_dict()
-        mapped = apply_category_mapping(row_dict, available_l_cols)
-        record = {
-            "date": row_dict.get("TestDates"),
-            **mapped,
-            "total": row_dict.get("Total"),
-            "kwh": row_dict.get("kWh"),
-            "ef": last_ef,
-            "residential_tco2": mapped.get("residential", 0) * last_ef,
-            "commercial_tco2": mapped.get("commercial", 0) * last_ef,
-            "industrial_tco2": mapped.get("industrial", 0) * last_ef,
-            "agriculture_tco2": mapped.get("agriculture", 0) * last_ef,
-            "others_tco2": mapped.get("others", 0) * last_ef,
-            "total_tco2": row_dict.get("Total", 0) * last_ef,
-        }
-        records.append(record)
-
-    return {
-        "data": records,
+    return ORJSONResponse({
+        "data": orjson.Fragment(payload["data_json"]),
         "cagr": config["cagr"],
         "horizon_months": config["horizon"],
-        "ef_used": last_ef,
-    }
+        "ef_used": payload["ef_used"],
+    })
 
 
 @app.get("/api/cagr")
@@ -428,43 +823,41 @@ _forecast_lock = asyncio.Lock()
 @app.post("/api/run-forecast")
 async def run_forecast(body: RunForecastRequest | None = None):
     """
-    Run ra2.py with the specified or stored CAGR value.
-    Returns the result once the script completes.
+    Run the ra2 forecast with the specified or stored CAGR value.
+    Returns the result once the forecast completes.
     """
     if _forecast_lock.locked():
         raise HTTPException(status_code=409, detail="A forecast is already running")
 
     async with _forecast_lock:
-        config = read_cagr_config()
+        config = await asyncio.to_thread(read_cagr_config)
         cgr = body.cagr if (body and body.cagr is not None) else config["cagr"]
         horizon = body.horizon if (body and body.horizon is not None) else config["horizon"]
-        write_cagr_config(cgr, horizon)
-
-        cmd = ["python3", str(RA2_SCRIPT), "--cgr", str(cgr), "--horizon", str(horizon)]
+        await asyncio.to_thread(write_cagr_config, cgr, horizon)
 
         try:
-            process = await asyncio.create_subprocess_exec(
-                *cmd,
-                stdout=asyncio.subprocess.PIPE,
-                stderr=asyncio.subprocess.PIPE,
-                cwd=str(BASE_DIR),
-            )
-            stdout, stderr = await process.communicate()
-
-            if process.returncode != 0:
-                add_audit_entry(
+            # In-process run reuses the already imported pandas/sklearn stack and
+            # the cached historical DataFrame; the numeric work happens in a
+            # worker thread off the event loop.
+            try:
+                hist_df = await asyncio.to_thread(get_cached_historical)
+                await asyncio.to_thread(run_ra2, cgr, horizon, hist_df)
+            except Exception:
+                await asyncio.to_thread(
+                    add_audit_entry,
                     "run_forecast",
                     f"Forecast failed CAGR={cgr} horizon={horizon}",
                     status="error",
                 )
                 return {
                     "status": "error",
-                    "returncode": process.returncode,
-                    "stderr": stderr.decode("utf-8", errors="replace")[-2000:],
-                    "stdout": stdout.decode("utf-8", errors="replace")[-2000:],
+                    "stderr": traceback.format_exc()[-2000:],
                 }
 
-            add_audit_entry(
+            # Build the /api/forecast payload now so the first GET is served from memory
+            await asyncio.to_thread(get_cached_forecast)
+            await asyncio.to_thread(
+                add_audit_entry,
                 "run_forecast",
                 f"Forecast succeeded CAGR={cgr} horizon={horizon}",
             )
@@ -482,10 +875,11 @@ async def run_forecast(body: RunForecastRequest | None = None):
 # ---------- Data Refresh ----------
 
 @app.post("/api/refresh")
-def refresh_data():
+def refresh_data(background_tasks: BackgroundTasks):
     """Manually trigger a reload of historical data from disk."""
     try:
         df = load_historical()
+        background_tasks.add_task(warm_payloads)
         add_audit_entry("manual_refresh", f"Historical data reloaded — {len(df)} rows")
         return {"status": "success", "message": f"Reloaded {len(df)} rows from historical CSV"}
     except FileNotFoundError as exc:
@@ -499,10 +893,63 @@ def refresh_data():
 
 ALLOWED_EXTENSIONS = {".csv", ".xlsx", ".xls"}
 MAX_FILE_SIZE_MB = 50
+UPLOAD_CHUNK_SIZE = 1 << 20
+
+
+async def _stream_upload(file: UploadFile, dest: Path) -> str:
+    """
+    Copy the upload to `dest` chunk by chunk, enforcing the size limit and
+    hashing as it goes. Returns the sha256 hex digest.
+    """
+    limit = MAX_FILE_SIZE_MB * 1024 * 1024
+    digest = hashlib.sha256()
+    size = 0
+    with open(dest, "wb") as out:
+        while chunk := await file.read(UPLOAD_CHUNK_SIZE):
+            size += len(chunk)
+            if size > limit:
+                raise HTTPException(status_code=413, detail=f"File exceeds {MAX_FILE_SIZE_MB} MB limit")
+            digest.update(chunk)
+            await asyncio.to_thread(out.write, chunk)
+    return digest.hexdigest()
+
+
+def _read_csv_header(path: Path) -> pd.DataFrame:
+    """Read only the header row of a CSV upload (an empty DataFrame with its columns)."""
+    return pd.read_csv(path, nrows=0)
+
+
+def _count_csv_rows(path: Path) -> int:
+    """Count a CSV's non-blank data lines without parsing them (what read_csv's len would be)."""
+    with open(path, "rb") as f:
+        return max(sum(1 for line in f if line.strip()) - 1, 0)
+
+
+def _parse_upload(path: Path, suffix: str) -> pd.DataFrame:
+    """Parse an uploaded CSV / Excel file into a DataFrame."""
+    if suffix == ".csv":
+        # The C parser NaN-fills short rows, which validation then reports as missing
+        # values (and cleaning can fix); the Arrow reader would reject the whole file
+        return _with_historical_dtypes(pd.read_csv(path))
+    return pd.read_excel(path, engine="openpyxl")
+
+
+def _replace_historical(df: pd.DataFrame, reparse: bool = False):
+    """
+    Overwrite the historical CSV and install `df` as the cache.
+    With reparse=True the cache is re-read from the written CSV instead, for
+    sources (Excel) whose parsed types differ from a CSV read.
+    """
+    write_atomic(HISTORICAL_CSV, lambda tmp: df.to_csv(tmp, index=False))
+    if reparse:
+        load_historical()
+    else:
+        set_historical(df)
 
 
 @app.post("/api/upload")
 async def upload_data(
+    background_tasks: BackgroundTasks,
     file: UploadFile = File(...),
     target: str = Query(default="historical", description="Target dataset: 'historical'"),
     user: str = Query(default="anonymous", description="Username performing the upload"),
@@ -520,58 +967,62 @@ async def upload_data(
             detail=f"Unsupported file type '{suffix}'. Allowed: {', '.join(ALLOWED_EXTENSIONS)}"
         )
 
-    content = await file.read()
-    if len(content) > MAX_FILE_SIZE_MB * 1024 * 1024:
-        raise HTTPException(status_code=413, detail=f"File exceeds {MAX_FILE_SIZE_MB} MB limit")
-
-    # Parse
+    UPLOADS_DIR.mkdir(parents=True, exist_ok=True)
+    tmp_path = UPLOADS_DIR / f".tmp.{uuid4().hex}"
     try:
-        if suffix == ".csv":
-            df = pd.read_csv(io.BytesIO(content))
-        else:
-            df = pd.read_excel(io.BytesIO(content), engine="openpyxl")
-    except Exception as exc:
-        raise HTTPException(status_code=422, detail=f"Failed to parse file: {exc}")
+        file_hash = (await _stream_upload(file, tmp_path))[:16]
 
-    # Validate
-    validation = validate_dataframe(df)
-    if validation["errors"]:
-        add_audit_entry(
-            "upload",
-            f"Upload rejected — validation errors: {'; '.join(validation['errors'])}",
-            user=user,
-            status="error",
-        )
-        return {
-            "status": "error",
-            "validation": validation,
-            "message": "Upload rejected due to validation errors",
-        }
+        # Parse (pandas work runs in a worker thread to keep the event loop free).
+        # A CSV missing required columns is rejected from its header row alone.
+        try:
+            df = await asyncio.to_thread(_read_csv_header, tmp_path) if suffix == ".csv" else None
+            header_only = df is not None and not REQUIRED_COLUMNS <= set(df.columns)
+            if not header_only:
+                df = await asyncio.to_thread(_parse_upload, tmp_path, suffix)
+        except Exception as exc:
+            raise HTTPException(status_code=422, detail=f"Failed to parse file: {exc}")
+
+        # Validate
+        validation = await asyncio.to_thread(validate_dataframe, df)
+        if header_only:
+            # The header-only frame has no rows; report the file's own row count
+            validation["row_count"] = await asyncio.to_thread(_count_csv_rows, tmp_path)
+        if validation["errors"]:
+            await asyncio.to_thread(
+                add_audit_entry,
+                "upload",
+                f"Upload rejected — validation errors: {'; '.join(validation['errors'])}",
+                user=user,
+                status="error",
+            )
+            return {
+                "status": "error",
+                "validation": validation,
+                "message": "Upload rejected due to validation errors",
+            }
 
-    # Optionally clean
-    cleaning_actions = []
-    if apply_cleaning:
-        df, cleaning_actions = clean_dataframe(df, strategy=cleaning_strategy)
+        # Optionally clean
+        cleaning_actions = []
+        if apply_cleaning:
+            df, cleaning_actions = await asyncio.to_thread(clean_dataframe, df, strategy=cleaning_strategy)
 
-    # Save uploaded file archive
-    UPLOADS_DIR.mkdir(parents=True, exist_ok=True)
-    timestamp = datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%SZ")
-    archive_name = f"{timestamp}_{file.filename}"
-    archive_path = UPLOADS_DIR / archive_name
-    with open(archive_path, "wb") as fh:
-        fh.write(content)
+        # Keep the uploaded file as the archive copy
+        timestamp = datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%SZ")
+        archive_name = f"{timestamp}_{file.filename}"
+        await asyncio.to_thread(tmp_path.replace, UPLOADS_DIR / archive_name)
+    finally:
+        tmp_path.unlink(missing_ok=True)
 
     # Replace historical CSV
     if target == "historical":
-        df.to_csv(HISTORICAL_CSV, index=False)
-        load_historical()  # refresh cache
+        await asyncio.to_thread(_replace_historical, df, suffix != ".csv")
+        background_tasks.add_task(warm_payloads)
 
-    file_hash = hashlib.sha256(content).hexdigest()[:16]
     detail = (
         f"Uploaded '{file.filename}' ({len(df)} rows, sha256={file_hash}); "
         f"target={target}; cleaning={cleaning_actions}"
     )
-    add_audit_entry("upload", detail, user=user)
+    await asyncio.to_thread(add_audit_entry, "upload", detail, user=user)
 
     return {
         "status": "success" if not validation["warnings"] else "warning",
@@ -599,7 +1050,7 @@ def get_data_quality():
 # ---------- Data Cleaning ----------
 
 @app.post("/api/clean")
-def clean_historical(body: CleanRequest):
+def clean_historical(body: CleanRequest, background_tasks: BackgroundTasks):
     """
     Preview or apply cleaning of the historical dataset.
     If apply=false (default), returns a preview of what would be changed.
@@ -615,8 +1066,8 @@ def clean_historical(body: CleanRequest):
         return {"status": "ok", "message": "No cleaning actions needed", "actions": []}
 
     if body.apply:
-        cleaned_df.to_csv(HISTORICAL_CSV, index=False)
-        load_historical()
+        _replace_historical(cleaned_df)
+        background_tasks.add_task(warm_payloads)
         add_audit_entry(
             "clean",
             f"Applied cleaning (strategy={body.strategy}): {'; '.join(actions)}",
@@ -644,15 +1095,23 @@ def get_audit_logs(
     action: Optional[str] = Query(default=None, description="Filter by action type"),
 ):
     """Return paginated audit log entries, newest first."""
-    entries = _load_audit_log()
-    entries_sorted = list(reversed(entries))
+    start = (page - 1) * page_size
 
-    if action:
-        entries_sorted = [e for e in entries_sorted if e.get("action") == action]
+    # Entry count and a size ending on a line boundary, taken together under the append lock
+    with _audit_lock:
+        total = _ensure_audit_seq()
+        size = AUDIT_LOG_FILE.stat().st_size if AUDIT_LOG_FILE.exists() else 0
 
-    total = len(entries_sorted)
-    start = (page - 1) * page_size
-    page_entries = entries_sorted[start: start + page_size]
+    if action:
+        entries = _load_audit_log(action, size)
+        total = len(entries)
+        # Slice the requested page from the end, newest first, without reversing the whole list
+        end = max(total - start, 0)
+        page_entries = entries[max(end - page_size, 0):end][::-1]
+    else:
+        # Read backwards from that offset; only the newest page * page_size lines are touched
+        lines = _read_audit_tail(size, start + page_size) if size else []
+        page_entries = [orjson.loads(line) for line in lines[start:]]
 
     return {
         "total": total,
@@ -666,4 +1125,16 @@ def get_audit_logs(
 
 if __name__ == "__main__":
     import uvicorn
-    uvicorn.run(app, host="0.0.0.0", port=8000)
+    # uvicorn's default "auto" loop/http already pick uvloop and httptools where
+    # uvicorn[standard] installs them.
+    # Single worker only (see the module docstring): extra workers would hand out
+    # duplicate audit ids and serve data another worker has already replaced.
+    workers = os.environ.get("WEB_CONCURRENCY", "").strip()
+    if workers not in ("", "1"):
+        raise SystemExit(f"app.py runs a single worker (WEB_CONCURRENCY={workers!r}); unset it or set it to 1")
+    uvicorn.run(
+        "app:app",
+        app_dir=str(BASE_DIR),
+        host="0.0.0.0",
+        port=8000,
+    )